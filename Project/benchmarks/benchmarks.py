@@ -44,7 +44,7 @@ from src.qr_configuration import QREncodingConfiguration
 from src.qr_encoding import qr_version_for_size
 from src.qr_pipeline import create_qr_video_encoding_pipeline
 from src.qr_video_encoder import QRVideoEncoder
-from src.utils import generate_random_bytes, remove_file, try_get_iter_count
+from src.utils import generate_random_bytes, remove_file
 from tqdm import tqdm
 
 
@@ -316,7 +316,7 @@ def _benchmark_encoder_roundtrip(
 
     video_size_bytes = os.path.getsize(MP4_FILE)
 
-    _, frames_count, _ = try_get_iter_count(frames)
+    frames_count = sum(1 for _ in frames)
 
     return (
         time_encode_ms,
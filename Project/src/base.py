@@ -5,12 +5,12 @@ A module containing core classes and functions that are used by other modules in
 import base64
 import pickle
 from dataclasses import dataclass
-from itertools import chain
 from time import perf_counter
 from typing import Callable, Iterator, Optional
 
 from src.constants import BYTE_ORDER_BIG, CONFIGURATION_HEADER_LENGTH_BYTES
-from src.utils import bytes_to_display, get_core_specifications, try_get_iter_count
+from src.enums import VideoCodec
+from src.utils import bytes_to_display, get_core_specifications
 
 
 @dataclass
@@ -21,6 +21,18 @@ class EncodingConfiguration:
     verbose: bool = False
     chunk_size: Optional[int] = None
     max_workers: Optional[int] = None
+    video_codec: VideoCodec = VideoCodec.MP4V
+
+    # Only every n'th frame is read when decoding a video. A stride above one only suits
+    # videos that repeat each frame at least n times, e.g. screen captures recorded at a
+    # multiple of the QR code frame rate, as the pipeline's own videos hold each frame once.
+    frame_stride: int = 1
+
+    def __post_init__(self):
+        if self.frame_stride < 1:
+            raise ValueError(
+                f"The frame stride must be at least 1, but was {self.frame_stride}."
+            )
 
     @staticmethod
     def serialize_with_length_prefix(config: "EncodingConfiguration") -> bytes:
@@ -149,6 +161,25 @@ class PipelineValidationException(Exception):
     pass
 
 
+def _chain_frames[TFrame](
+    header_frames: Iterator[TFrame], payload_frames: Iterator[TFrame]
+) -> Iterator[TFrame]:
+    """
+    Helper function that yields the header frames followed by the payload frames.
+
+    Unlike 'itertools.chain', closing the returned generator also closes the payload frames,
+    which releases the resources held by the encoder, e.g. its worker pool.
+    """
+
+    try:
+        yield from header_frames
+        yield from payload_frames
+    finally:
+        close = getattr(payload_frames, "close", None)
+        if close is not None:
+            close()
+
+
 @dataclass
 class VideoEncodingPipeline[TFrame]:
     """A dataclass representing a video encoding pipeline."""
@@ -180,8 +211,8 @@ class VideoEncodingPipeline[TFrame]:
         header_serialized = self.serializer.serialize(header_with_length)
         header_frames = self.encoder.encode(header_serialized, configuration, True)
 
-        success, count, header_frames = try_get_iter_count(header_frames)
-        if success and count != 1:
+        header_frames = list(header_frames)
+        if len(header_frames) != 1:
             raise PipelineValidationException(
                 "The configuration header must be exactly one frame."
             )
@@ -190,7 +221,7 @@ class VideoEncodingPipeline[TFrame]:
         payload_serialized = self.serializer.serialize(data)
         payload_frames = self.encoder.encode(payload_serialized, configuration, False)
 
-        total_frames = chain(header_frames, payload_frames)
+        total_frames = _chain_frames(header_frames, payload_frames)
 
         if file_path:
             self.video_handler.write(total_frames, file_path, configuration)
@@ -5,6 +5,8 @@ A file containing enums that are used by other parts of the package.
 from enum import Enum, unique
 from typing import Dict
 
+from src.constants import FFV1, MP4V
+
 
 @unique
 class QRErrorCorrectionLevel(Enum):
@@ -90,8 +92,49 @@ class QRDecodingLibrary(Enum):
     """
     QR code decoding libraries in use.
 
-    OpenCV currently not in use.
+    OpenCV falls back to 'pyzbar' for frames it cannot decode, or that hold non-ASCII bytes.
+    OpenCV stops reading at NUL bytes, so it only suits serializers without them, e.g. Base64.
     """
 
     PYZBAR = 0
-    # OPEN_CV = 1
+    OPEN_CV = 1
+
+
+@unique
+class VideoCodec(Enum):
+    """
+    Video codecs used for writing QR code videos.
+
+    FFV1 is lossless and writes grayscale frames, but requires a container such as '.avi' or '.mkv'.
+    """
+
+    MP4V = 0
+    FFV1 = 1
+
+    @staticmethod
+    def to_fourcc(video_codec: "VideoCodec") -> str:
+        """
+        Returns the FourCC code of the video codec.
+        """
+
+        if not isinstance(video_codec, VideoCodec):
+            raise ValueError(f"Unexpected value: {type(video_codec)}.")
+
+        codec_to_fourcc_lookup: Dict[VideoCodec, str] = {
+            VideoCodec.MP4V: MP4V,
+            VideoCodec.FFV1: FFV1,
+        }
+
+        return codec_to_fourcc_lookup[video_codec]
+
+    @staticmethod
+    def is_color(video_codec: "VideoCodec") -> bool:
+        """
+        Returns whether the video codec writes colour frames, rather than grayscale frames.
+        """
+
+        if not isinstance(video_codec, VideoCodec):
+            raise ValueError(f"Unexpected value: {type(video_codec)}.")
+
+        # Lossless FFV1 videos are written in grayscale, as QR codes carry no colour.
+        return video_codec != VideoCodec.FFV1
@@ -2,9 +2,30 @@
 A module that contains functions used for measuring the performance of tasks.
 """
 
-from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from queue import Empty, Full, Queue
+from threading import Event, Thread
 from time import perf_counter
-from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, overload
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    overload,
+)
 
 from src.constants import (
     MILLISECONDS_PER_SECOND,
@@ -13,6 +34,10 @@ from src.constants import (
 )
 from tqdm import tqdm
 
+MAX_PENDING_TASKS_PER_WORKER = 2
+PREFETCH_POLL_INTERVAL_SECONDS = 0.1
+PROCESS_START_METHOD = "spawn"
+
 # region ----- Multiprocessing -----
 
 
@@ -22,14 +47,17 @@ def execute_parallel_tasks[T](
     verbose: bool = False,
     description: str = "Processing",
     max_workers: Optional[int] = None,
+    use_threads: bool = False,
 ) -> List[T]:
     """
     Executes iterable tasks in parallel and returns the ordered results in a list.
+
+    Threads can be used instead of processes for tasks that release the GIL.
     """
 
     results: Dict[int, T] = {}
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    with _create_executor(max_workers, use_threads) as executor:
         results = list(
             tqdm(
                 executor.map(_execute_task, tasks),
@@ -50,30 +78,149 @@ def execute_parallel_iter_tasks[T](
     verbose: bool = False,
     description: str = "Processing",
     max_workers: Optional[int] = None,
+    use_threads: bool = False,
 ) -> Iterator[T]:
     """
     Executes iterable tasks in parallel and returns the ordered results as an iterator.
+
+    Threads can be used instead of processes for tasks that release the GIL.
     """
 
-    results: Dict[int, T] = {}
+    # Only a bounded number of tasks are submitted ahead of the yielded result, so
+    # lazy task iterables (e.g. video frames) are not materialized all at once.
+    max_pending = MAX_PENDING_TASKS_PER_WORKER * (max_workers or os.cpu_count() or 1)
+    pending: Deque[Future[T]] = deque()
+
+    with (
+        _create_executor(max_workers, use_threads) as executor,
+        tqdm(
+            total=length,
+            desc=description,
+            disable=not verbose,
+            bar_format=TQDM_BAR_FORMAT,
+            colour=TQDM_BAR_COLOUR_GREEN,
+        ) as progress_bar,
+    ):
+        for task in tasks:
+            pending.append(executor.submit(_execute_task, task))
+
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+                progress_bar.update(1)
+
+        while pending:
+            yield pending.popleft().result()
+            progress_bar.update(1)
+
+
+def execute_prefetched_iter[T](
+    items: Iterable[T], max_prefetched: int = 4, drop_oldest: bool = False
+) -> Iterator[T]:
+    """
+    Consumes the iterable on a background thread and returns the items as an iterator.
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        results = executor.map(_execute_task, tasks)
+    At most 'max_prefetched' items are held ready, which overlaps producing the items
+    with the work the caller does on each item, without materializing the iterable.
 
-        if verbose:
-            with tqdm(
-                executor.map(_execute_task, tasks),
-                total=length,
-                desc=description,
-                disable=False,
-                bar_format=TQDM_BAR_FORMAT,
-                colour=TQDM_BAR_COLOUR_GREEN,
-            ) as progress_bar:
-                for result in results:
-                    progress_bar.update(1)
-                    yield result
-        else:
-            yield from results
+    If 'drop_oldest' is set, the producer never waits for the caller, and the oldest
+    held item is discarded instead when the buffer is full.
+
+    When the returned iterator is closed or garbage collected, the background thread
+    stops and closes the iterable on its own thread, releasing any held resources.
+    """
+
+    buffer: Queue[Tuple[bool, Optional[T], Optional[BaseException]]] = Queue(
+        maxsize=max_prefetched
+    )
+    stop = Event()
+
+    def put(
+        entry: Tuple[bool, Optional[T], Optional[BaseException]], drop: bool
+    ) -> bool:
+        # Retries until the entry is buffered, or gives up once the caller has stopped.
+        while not stop.is_set():
+            try:
+                if drop:
+                    buffer.put_nowait(entry)
+                else:
+                    buffer.put(entry, timeout=PREFETCH_POLL_INTERVAL_SECONDS)
+                return True
+            except Full:
+                if drop:
+                    try:
+                        buffer.get_nowait()
+                    except Empty:
+                        pass
+
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put((False, item, None), drop_oldest):
+                    return
+        except BaseException as exception:
+            put((True, None, exception), False)
+            return
+        finally:
+            # Closes the iterable here, as a generator cannot be closed from another thread.
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+        put((True, None, None), False)
+
+    producer = Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            is_done, item, exception = buffer.get()
+            if exception is not None:
+                raise exception
+            if is_done:
+                return
+
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def _create_executor(max_workers: Optional[int], use_threads: bool) -> Executor:
+    """
+    Helper method that creates either a thread or a process pool executor.
+
+    Threads share memory with the caller, so task arguments are not pickled.
+    On free-threaded Python builds threads also run Python code in parallel,
+    so they are used for all tasks.
+
+    Process pools are often created while a prefetching thread is running, and forking
+    a multi-threaded process can deadlock, so the worker processes are spawned instead.
+    """
+
+    if use_threads or not _is_gil_enabled():
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+    )
+
+
+def _is_gil_enabled() -> bool:
+    """
+    Helper method that checks whether the running interpreter has the GIL enabled.
+
+    'sys._is_gil_enabled' only exists from Python 3.13, and older versions always have the GIL.
+    """
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is None:
+        return True
+
+    return is_gil_enabled()
 
 
 def _execute_task[T](task: Callable[..., T]) -> T:
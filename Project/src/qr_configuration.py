@@ -3,6 +3,7 @@ A module that contains the QR codes pipeline configuration.
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from src.base import EncodingConfiguration
 from src.enums import QRDecodingLibrary, QREncodingLibrary, QRErrorCorrectionLevel
@@ -20,7 +21,15 @@ class QREncodingConfiguration(EncodingConfiguration):
     qr_codes_per_frame: int = 1
     qr_encoding_library: QREncodingLibrary = QREncodingLibrary.SEGNO
     qr_decoding_library: QRDecodingLibrary = QRDecodingLibrary.PYZBAR
+    max_decode_dimension: Optional[int] = None
 
     def __post_init__(self):
+        super().__post_init__()
+
+        if self.max_decode_dimension is not None and self.max_decode_dimension < 1:
+            raise ValueError(
+                f"The maximum decode dimension must be at least 1, but was {self.max_decode_dimension}."
+            )
+
         if self.qr_codes_per_frame != 1:
             raise NotImplementedError()
@@ -2,19 +2,24 @@
 A module that contains functions for decoding QR codes.
 """
 
+import math
+import threading
+from contextlib import closing
 from functools import partial
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional
 
-from cv2 import QRCodeDetector
+import cv2
 from pyzbar.pyzbar import ZBarSymbol, decode
 from src.constants import TQDM_BAR_COLOUR_GREEN, TQDM_BAR_FORMAT, MatLike
 from src.enums import QRDecodingLibrary
-from src.performance import execute_parallel_iter_tasks
+from src.performance import execute_parallel_iter_tasks, execute_prefetched_iter
 from src.qr_configuration import QREncodingConfiguration
-from src.utils import try_get_iter_count
 from tqdm import tqdm
 
 DECODING_STRING = "Decoding QR code video"
+MAX_PREFETCHED_FRAMES = 32
+
+_detector_local = threading.local()
 
 
 def decode_frames_to_data(
@@ -27,22 +32,53 @@ def decode_frames_to_data(
     https://stackoverflow.com/questions/18954889/how-to-process-images-of-a-video-frame-by-frame-in-video-streaming-using-openc
     """
 
-    valid, length, frames = try_get_iter_count(frames)
-    if not valid or length == 0:
+    # Frames are read on a background thread while the previous ones are decoded,
+    # unless the decoding window is shown, as its GUI calls must stay on one thread.
+    # Closing the prefetched frames stops that thread, also when decoding fails.
+    if configuration is not None and configuration.show_decoding_window:
+        decoded_parts = _decode_frames(frames, configuration)
+    else:
+        with closing(
+            execute_prefetched_iter(frames, max_prefetched=MAX_PREFETCHED_FRAMES)
+        ) as prefetched_frames:
+            decoded_parts = _decode_frames(prefetched_frames, configuration)
+
+    if not decoded_parts:
         raise ValueError("No frames were supplied to the decoding function.")
 
-    decoded_frames = bytearray()
+    # Failed frames decode to empty bytes, so that one bad frame does not abort the loop.
+    failed_count = decoded_parts.count(b"")
+    if failed_count > 0:
+        raise ValueError(
+            f"Decoding did not yield any results for {failed_count} of {len(decoded_parts)} frames."
+        )
+
+    return b"".join(decoded_parts)
+
+
+def _decode_frames(
+    frames: Iterator[MatLike], configuration: Optional[QREncodingConfiguration]
+) -> List[bytes]:
+    """
+    Helper method that decodes each frame, returning the decoded parts in frame order.
+    """
+
+    decoded_parts: List[bytes] = []
+    append = decoded_parts.append
 
     if configuration and configuration.enable_multiprocessing:
+        # Both 'pyzbar' and OpenCV decode in C code that releases the GIL, so threads are
+        # used to avoid pickling every frame to a worker process.
         tasks = (partial(_decode_qr_image, frame, configuration) for frame in frames)
         for result in execute_parallel_iter_tasks(
             tasks=tasks,
-            length=length,
+            length=None,
             verbose=configuration.verbose,
             description=DECODING_STRING,
             max_workers=configuration.max_workers,
+            use_threads=True,
         ):
-            decoded_frames.extend(result)
+            append(result)
     else:
         for frame in tqdm(
             frames,
@@ -51,9 +87,9 @@ def decode_frames_to_data(
             bar_format=TQDM_BAR_FORMAT,
             colour=TQDM_BAR_COLOUR_GREEN,
         ):
-            decoded_frames.extend(_decode_qr_image(frame, configuration))
+            append(_decode_qr_image(frame, configuration))
 
-    return bytes(decoded_frames)
+    return decoded_parts
 
 
 def _decode_qr_image(image: MatLike, configuration: QREncodingConfiguration) -> bytes:
@@ -61,35 +97,84 @@ def _decode_qr_image(image: MatLike, configuration: QREncodingConfiguration) ->
     Decodes a QR code image and returns the resulting bytes data.
 
     If the image contains more than one QR code, all codes are decoded.
+    If no QR code could be decoded, empty bytes are returned.
     """
 
-    data = bytearray()
+    if configuration is not None and configuration.max_decode_dimension is not None:
+        image = _downscale_image(image, configuration.max_decode_dimension)
 
     if (
         configuration is None
         or configuration.qr_decoding_library == QRDecodingLibrary.PYZBAR
     ):
-        decoded_list = decode(image, [ZBarSymbol.QRCODE])
-        if not decoded_list:
-            raise ValueError("Decoding did not yield any results.")
-
-        for decoded_item in decoded_list:
-            data.extend(decoded_item.data)
+        return _decode_qr_image_with_pyzbar(image)
 
     elif configuration.qr_decoding_library == QRDecodingLibrary.OPEN_CV:
-        detector = QRCodeDetector()
+        detector = _get_qr_code_detector()
+
+        # OpenCV returns byte mode payloads as text, which is latin-1 for most bytes, but
+        # UTF-8 decoded when the bytes happen to be valid UTF-8. Only ASCII text maps back
+        # to the original bytes unambiguously, so any other text is decoded by 'pyzbar'.
+        success, decoded_texts, _, _ = detector.detectAndDecodeMulti(image)
+        if (
+            success
+            and decoded_texts
+            and all(text and text.isascii() for text in decoded_texts)
+        ):
+            return b"".join(text.encode("latin1") for text in decoded_texts)
 
-        text, _, _ = detector.detectAndDecode(image)
-        if not text:
-            raise ValueError("Decoding did not yield any results.")
+        # OpenCV fails on some dense codes, so 'pyzbar' is used as a fallback.
+        return _decode_qr_image_with_pyzbar(image)
 
-        data = text.encode("utf-8")
     else:
         raise ValueError(
             f"Unexpected decoding library: {configuration.qr_decoding_library}"
         )
 
-    try:
-        return bytes(data)
-    except Exception as e:
-        raise ValueError(f"Could not convert decoded data to bytes: {e}")
+
+def _decode_qr_image_with_pyzbar(image: MatLike) -> bytes:
+    """
+    Decodes a QR code image with 'pyzbar', returning empty bytes if no QR code could be decoded.
+    """
+
+    decoded_list = decode(image, [ZBarSymbol.QRCODE])
+    if not decoded_list:
+        return b""
+
+    # 'pyzbar' returns the data as bytes, so a single code needs no copy.
+    if len(decoded_list) == 1:
+        return decoded_list[0].data
+
+    return b"".join(decoded_item.data for decoded_item in decoded_list)
+
+
+def _downscale_image(image: MatLike, max_dimension: int) -> MatLike:
+    """
+    Downscales an image by an integer factor until neither side exceeds the maximum dimension.
+
+    Detection time grows with the pixel count, while QR code modules usually span several pixels.
+    """
+
+    height, width = image.shape[:2]
+    factor = math.ceil(max(height, width) / max_dimension)
+    if factor <= 1:
+        return image
+
+    return cv2.resize(
+        image, (width // factor, height // factor), interpolation=cv2.INTER_AREA
+    )
+
+
+def _get_qr_code_detector() -> cv2.QRCodeDetector:
+    """
+    Returns the QR code detector of the calling thread, creating it on first use.
+
+    Constructing a detector allocates internal buffers, so one instance is kept per thread.
+    """
+
+    detector = getattr(_detector_local, "detector", None)
+    if detector is None:
+        detector = cv2.QRCodeDetector()
+        _detector_local.detector = detector
+
+    return detector
@@ -2,23 +2,28 @@
 A module that contains functions for encoding QR codes.
 """
 
-import io
-from functools import partial
-from typing import Iterator, Optional
-
+import hashlib
+import math
+from collections import OrderedDict, deque
+from contextlib import closing
+from functools import lru_cache, partial
+from typing import Callable, Deque, Iterator, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
 import qrcode
 import segno
-from PIL import Image
 from qrcode.util import MODE_8BIT_BYTE, QRData
-from src.constants import RGB, TQDM_BAR_COLOUR_GREEN, TQDM_BAR_FORMAT, MatLike
-from src.enums import QREncodingLibrary, QRErrorCorrectionLevel
+from src.constants import TQDM_BAR_COLOUR_GREEN, TQDM_BAR_FORMAT, MatLike
+from src.enums import QREncodingLibrary, QRErrorCorrectionLevel, VideoCodec
 from src.performance import execute_parallel_iter_tasks
 from src.qr_configuration import QREncodingConfiguration
 from src.utils import bytes_to_display
-from src.video_processing import _pil_to_cv2
 from tqdm import tqdm
 
 ENCODING_QR_FRAMES_STRING = "Encoding QR code video"
+SEGNO_SCALE = 5
+QR_MODULES_CACHE_SIZE = 64
 
 
 def encode_data_to_frames(
@@ -33,9 +38,12 @@ def encode_data_to_frames(
     return generate_qr_frames(data, configuration, is_header)
 
 
+@lru_cache(maxsize=None)
 def qr_version_for_size(data_len: int, error_correction: QRErrorCorrectionLevel) -> int:
     """
     Returns the smallest possible QR version that can hold payload.
+
+    The result only depends on the arguments, so it is cached, as chunks mostly share one size.
     """
 
     data = b"\0" * data_len
@@ -61,31 +69,168 @@ def generate_qr_frames(
     max_bytes = QRErrorCorrectionLevel.to_max_bytes(configuration.error_correction)
 
     if is_header:
+        if len(data) > max_bytes:
+            raise ValueError(
+                f"Data size is {bytes_to_display(len(data))}. The maximum allowed size for a QR code is {bytes_to_display(max_bytes)}."
+            )
+
         yield _generate_qr_image(data, configuration)
         return
 
-    if configuration.chunk_size is not None:
-        max_bytes = min(configuration.chunk_size, max_bytes)
+    max_bytes = _get_chunk_size(configuration)
 
     chunks = (data[i : i + max_bytes] for i in range(0, len(data), max_bytes))
 
+    # The module caches only live for this call, so nothing is held after encoding.
     if configuration.enable_multiprocessing:
-        yield from execute_parallel_iter_tasks(
-            (partial(_generate_qr_image, chunk, configuration) for chunk in chunks),
-            length=len(range(0, len(data), max_bytes)),
-            max_workers=configuration.max_workers,
-            verbose=configuration.verbose,
-            description=ENCODING_QR_FRAMES_STRING,
-        )
+        qr_modules = _generate_qr_modules_parallel(chunks, configuration)
     else:
-        for chunk in tqdm(
-            chunks,
+        cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        qr_modules = (
+            _generate_qr_modules_cached(chunk, configuration, cache) for chunk in chunks
+        )
+
+    # Closing the frames also closes the module generation, which shuts down its worker pool.
+    with closing(qr_modules):
+        for modules in tqdm(
+            qr_modules,
+            total=count_qr_frames(len(data), configuration),
             desc=ENCODING_QR_FRAMES_STRING,
             disable=not configuration.verbose,
             bar_format=TQDM_BAR_FORMAT,
             colour=TQDM_BAR_COLOUR_GREEN,
         ):
-            yield _generate_qr_image(chunk, configuration)
+            yield _qr_modules_to_cv2(modules, configuration)
+
+
+def count_qr_frames(data_length: int, configuration: QREncodingConfiguration) -> int:
+    """
+    Returns the number of QR code frames that 'generate_qr_frames' yields for data of the given length.
+    """
+
+    return math.ceil(data_length / _get_chunk_size(configuration))
+
+
+def _get_chunk_size(configuration: QREncodingConfiguration) -> int:
+    """
+    Helper method that returns the number of bytes encoded in each QR code.
+    """
+
+    max_bytes = QRErrorCorrectionLevel.to_max_bytes(configuration.error_correction)
+    if configuration.chunk_size is not None:
+        max_bytes = min(configuration.chunk_size, max_bytes)
+
+    return max_bytes
+
+
+def _generate_qr_modules_cached(
+    data: bytes,
+    configuration: QREncodingConfiguration,
+    cache: OrderedDict[bytes, np.ndarray],
+) -> np.ndarray:
+    """
+    Generates a QR code module matrix, reusing the matrix of a recently encoded identical chunk.
+
+    Repeated chunks are common in padded or sparse data. The cache is keyed by a content hash,
+    and only holds the small module matrices, so every frame is still rasterized on its own.
+    """
+
+    key = _get_chunk_digest(data)
+
+    modules = _get_cached(cache, key)
+    if modules is None:
+        modules = _generate_qr_modules(data, configuration)
+        _put_cached(cache, key, modules)
+
+    return modules
+
+
+def _generate_qr_modules_parallel(
+    chunks: Iterator[bytes], configuration: QREncodingConfiguration
+) -> Iterator[np.ndarray]:
+    """
+    Generates the QR code module matrices of the chunks in worker processes, in chunk order.
+
+    Recently encoded identical chunks are deduplicated before submitting, so only new chunks
+    are sent to the workers, and repeated chunks reuse the cached module matrix.
+
+    Workers return packed module matrices, as pickling full images back from the workers
+    dominates otherwise.
+    """
+
+    # Each chunk is planned as its digest, and whether it was submitted to a worker.
+    # Both caches see the same sequence of lookups in chunk order, so a repeated chunk is
+    # still cached when its results are yielded, even though submitting runs ahead.
+    plan: Deque[Tuple[bytes, bool]] = deque()
+    submitted: OrderedDict[bytes, bool] = OrderedDict()
+    cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    def create_tasks() -> Iterator[Callable[[], np.ndarray]]:
+        for chunk in chunks:
+            key = _get_chunk_digest(chunk)
+
+            is_new = _get_cached(submitted, key) is None
+            if is_new:
+                _put_cached(submitted, key, True)
+
+            plan.append((key, is_new))
+
+            if is_new:
+                yield partial(_generate_packed_qr_modules, chunk, configuration)
+
+    with closing(
+        execute_parallel_iter_tasks(
+            create_tasks(),
+            length=None,
+            max_workers=configuration.max_workers,
+        )
+    ) as results:
+        for packed_modules in results:
+            # Repeated chunks planned before this result are taken from the cache.
+            key, is_new = plan.popleft()
+            while not is_new:
+                yield _get_cached(cache, key)
+                key, is_new = plan.popleft()
+
+            modules = _unpack_qr_modules(packed_modules)
+            _put_cached(cache, key, modules)
+
+            yield modules
+
+    # Repeated chunks that were planned after the last submitted chunk.
+    while plan:
+        key, _ = plan.popleft()
+        yield _get_cached(cache, key)
+
+
+def _get_chunk_digest(data: bytes) -> bytes:
+    """
+    Helper method that returns the content hash of a chunk, which keys the module caches.
+    """
+
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _get_cached[T](cache: OrderedDict[bytes, T], key: bytes) -> Optional[T]:
+    """
+    Helper method that returns the cached value of the key, marking it as recently used.
+    """
+
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+
+    return value
+
+
+def _put_cached[T](cache: OrderedDict[bytes, T], key: bytes, value: T) -> None:
+    """
+    Helper method that caches the value of the key, evicting the least recently used value.
+    """
+
+    cache[key] = value
+    if len(cache) > QR_MODULES_CACHE_SIZE:
+        cache.popitem(last=False)
 
 
 def _generate_qr_image(data: bytes, configuration: QREncodingConfiguration) -> MatLike:
@@ -93,30 +238,57 @@ def _generate_qr_image(data: bytes, configuration: QREncodingConfiguration) -> M
     Generates a QR code image based on the given data.
 
     Depending on the configuration, either 'qrcodes' or 'segno' will be used as a package.
+
+    The data is expected to fit in a single QR code, which the callers ensure by chunking.
     """
 
-    max_bytes = QRErrorCorrectionLevel.to_max_bytes(configuration.error_correction)
+    return _qr_modules_to_cv2(_generate_qr_modules(data, configuration), configuration)
 
-    if len(data) > max_bytes:
-        raise ValueError(
-            f"Data size is {bytes_to_display(len(data))}. The maximum allowed size for a QR code is {bytes_to_display(max_bytes)}."
-        )
 
-    image = None
+def _generate_packed_qr_modules(
+    data: bytes, configuration: QREncodingConfiguration
+) -> np.ndarray:
+    """
+    Generates the QR code module matrix of the given data, packed as eight modules per byte.
+
+    A packed matrix is a few kilobytes, whereas the rasterized image is several megabytes,
+    which makes it cheap to return from a worker process.
+    """
+
+    return np.packbits(_generate_qr_modules(data, configuration), axis=1)
+
+
+def _unpack_qr_modules(packed_modules: np.ndarray) -> np.ndarray:
+    """
+    Unpacks a QR code module matrix packed by '_generate_packed_qr_modules'.
+    """
+
+    # QR codes are square, so the row count is also the module count of each row.
+    module_count = packed_modules.shape[0]
+
+    return np.unpackbits(packed_modules, axis=1, count=module_count).astype(np.bool_)
+
+
+def _generate_qr_modules(
+    data: bytes, configuration: QREncodingConfiguration
+) -> np.ndarray:
+    """
+    Generates the QR code module matrix of the given data, where dark modules are True.
+    """
 
     if configuration.qr_encoding_library == QREncodingLibrary.QRCODE:
+        # The version is looked up instead of fitted, which 'qrcode' does per call.
         qr = qrcode.QRCode(
-            border=configuration.border,
-            box_size=configuration.box_size,
+            version=qr_version_for_size(len(data), configuration.error_correction),
             error_correction=QRErrorCorrectionLevel.to_qrcode(
                 configuration.error_correction
             ),
         )
 
         qr.add_data(QRData(data, mode=MODE_8BIT_BYTE))
-        qr.make(fit=True)
+        qr.make(fit=False)
 
-        image = qr.make_image()
+        return np.asarray(qr.modules, dtype=np.bool_)
 
     elif configuration.qr_encoding_library == QREncodingLibrary.SEGNO:
         qr = segno.make_qr(
@@ -125,15 +297,62 @@ def _generate_qr_image(data: bytes, configuration: QREncodingConfiguration) -> M
             error=QRErrorCorrectionLevel.to_segno(configuration.error_correction),
         )
 
-        out = io.BytesIO()
-        qr.save(out=out, scale=5, kind="png", border=configuration.border)
-        out.seek(0)
-
-        image = Image.open(out).convert(RGB)
+        return np.asarray(qr.matrix, dtype=np.bool_)
 
     else:
         raise ValueError(
             f"Unexpected value: {type(configuration.qr_encoding_library)}."
         )
 
-    return _pil_to_cv2(image)
+
+def _qr_modules_to_cv2(
+    modules: np.ndarray, configuration: QREncodingConfiguration
+) -> MatLike:
+    """
+    Rasterizes a QR code module matrix with the scale and border of the configuration.
+    """
+
+    scale = (
+        SEGNO_SCALE
+        if configuration.qr_encoding_library == QREncodingLibrary.SEGNO
+        else configuration.box_size
+    )
+
+    return _qr_matrix_to_cv2(
+        modules,
+        scale=scale,
+        border=configuration.border,
+        is_color=VideoCodec.is_color(configuration.video_codec),
+    )
+
+
+def _qr_matrix_to_cv2(
+    matrix: Sequence[Sequence[int]], scale: int, border: int, is_color: bool = True
+) -> MatLike:
+    """
+    Rasterizes a QR code module matrix, where dark modules are truthy, into a CV2 image array.
+
+    The image is allocated once as a (modules, scale, modules, scale, channels) block,
+    so every pixel is written directly without intermediate upscaled or padded copies.
+
+    Grayscale images have a single channel, so grayscale videos need no colour conversion.
+    """
+
+    modules = np.asarray(matrix, dtype=np.bool_)
+    module_count = len(modules)
+    total_count = module_count + 2 * border
+    channel_shape = (3,) if is_color else ()
+
+    # Light modules (including the border) are white and dark modules are black.
+    image = np.full(
+        (total_count, scale, total_count, scale, *channel_shape), 255, dtype=np.uint8
+    )
+    dark_modules = np.where(modules, 0, 255).astype(np.uint8)[:, None, :, None]
+    if is_color:
+        dark_modules = dark_modules[..., None]
+
+    image[border : border + module_count, :, border : border + module_count, :] = (
+        dark_modules
+    )
+
+    return image.reshape(total_count * scale, total_count * scale, *channel_shape)
@@ -4,11 +4,10 @@ A module containing utility functions that are used by other modules in the pack
 
 import os
 import random
-from itertools import tee
 from pathlib import Path
 from string import ascii_uppercase
 from tkinter import filedialog
-from typing import Iterator, Optional, Tuple
+from typing import Optional, Tuple
 
 import psutil
 from src.constants import PROJECT_DIRECTORY
@@ -21,7 +20,7 @@ def generate_random_ascii_string(n: int) -> str:
     Generates a string of n random ascii uppercase characters.
     """
 
-    return "".join(random.choice(ascii_uppercase) for _ in range(n))
+    return "".join(random.choices(ascii_uppercase, k=n))
 
 
 def generate_random_bytes(n: int, seed: Optional[int] = None) -> bytes:
@@ -137,13 +136,4 @@ def get_core_specifications() -> Tuple[int, int]:
     return physical_cores, logical_cores
 
 
-def try_get_iter_count(iterator: Iterator) -> Tuple[bool, int, Iterator]:
-    try:
-        copy, original = tee(iterator)
-        count = sum(1 for _ in copy)
-        return True, count, original
-    except Exception:
-        return (False, 0, None)
-
-
 # endregion
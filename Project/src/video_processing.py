@@ -3,28 +3,26 @@ A module that contains functions for video processing.
 """
 
 import time
+from contextlib import closing
 from dataclasses import dataclass
-from functools import partial
-from itertools import tee
-from typing import Iterator, List, Optional, Tuple, Union
+from itertools import count
+from typing import Iterator, List, Optional, Tuple
 
 import cv2
 import dxcam
-import numpy as np
-from PIL.Image import Image
-from qrcode.image.base import BaseImage
 from src.base import EncodingConfiguration, VideoHandler
 from src.constants import (
     BGR,
-    MP4V,
-    RGB,
     TQDM_BAR_COLOUR_GREEN,
     TQDM_BAR_FORMAT,
     MatLike,
 )
-from src.performance import execute_parallel_iter_tasks
+from src.enums import VideoCodec
+from src.performance import execute_prefetched_iter
 from tqdm import tqdm
 
+FPS_AVERAGE_WINDOW = 10
+
 # region ----- Video read / write -----
 
 
@@ -38,50 +36,75 @@ def create_video_from_frames(
     https://www.tutorialspoint.com/opencv_python/opencv_python_video_images.htm
     """
 
-    # Extract reference frame to determine the video image dimensions.
-    frames, peek = tee(frames)
+    _write_video(frames, file_path, configuration)
 
-    try:
-        reference_frame = next(peek)
-    except StopIteration:
-        return
 
-    height, width = reference_frame.shape[:2]
+def _write_video(
+    frames: Iterator[MatLike],
+    file_path: str,
+    configuration: EncodingConfiguration,
+    max_prefetched: int = 4,
+    drop_oldest: bool = False,
+) -> None:
+    """
+    Helper method that writes the frames to a video, while they are produced on a background thread.
 
-    fourcc = cv2.VideoWriter_fourcc(*MP4V)
-    video_writer = cv2.VideoWriter(
-        file_path,
-        fourcc,
-        configuration.frames_per_second,
-        (width, height),
-        isColor=True,
-    )
+    The frames iterable is only consumed and closed on that thread.
+    """
+
+    is_color = VideoCodec.is_color(configuration.video_codec)
 
-    # Make sure that the frame is shaped correctly for the writer.
-    if configuration.enable_multiprocessing:
-        resized_frames = execute_parallel_iter_tasks(
-            (partial(resize_frame, frame, (width, height)) for frame in frames),
-            length=None,
-            max_workers=configuration.max_workers,
-            verbose=False,
-            description="Resizing frames",
+    fourcc = cv2.VideoWriter_fourcc(*VideoCodec.to_fourcc(configuration.video_codec))
+    video_writer: Optional[cv2.VideoWriter] = None
+    size = (0, 0)
+
+    # Frames are produced on a background thread while the previous ones are written.
+    # Closing the prefetched frames stops that thread, also when writing fails.
+    with closing(
+        execute_prefetched_iter(
+            frames, max_prefetched=max_prefetched, drop_oldest=drop_oldest
         )
-    else:
-        resized_frames = (
-            resize_frame(frame, (width, height))
+    ) as prefetched_frames:
+        try:
             for frame in tqdm(
-                frames,
-                desc="Resizing frames",
+                prefetched_frames,
+                desc="Writing frames",
                 disable=not configuration.verbose,
                 bar_format=TQDM_BAR_FORMAT,
                 colour=TQDM_BAR_COLOUR_GREEN,
-            )
-        )
-
-    for frame in resized_frames:
-        video_writer.write(frame)
-
-    video_writer.release()
+            ):
+                # The first frame determines the video image dimensions.
+                if video_writer is None:
+                    height, width = frame.shape[:2]
+                    size = (width, height)
+                    video_writer = cv2.VideoWriter(
+                        file_path,
+                        fourcc,
+                        configuration.frames_per_second,
+                        size,
+                        isColor=is_color,
+                    )
+
+                    # An unsupported codec or container would silently drop every frame.
+                    if not video_writer.isOpened():
+                        raise ValueError(
+                            f"The video file '{file_path}' could not be opened for writing with the {configuration.video_codec.name} codec."
+                        )
+
+                # Make sure that the frame is shaped correctly for the writer.
+                # The shape is checked per frame, as the last chunk can yield a smaller QR code.
+                # Frames are resized in this process, as OpenCV already parallelizes the resize
+                # internally, and sending frames to worker processes costs far more than resizing.
+                frame = resize_frame(frame, size)
+
+                # QR code frames are already rasterized in grayscale for grayscale codecs.
+                if not is_color:
+                    frame = _bgr_to_grayscale(frame)
+
+                video_writer.write(frame)
+        finally:
+            if video_writer is not None:
+                video_writer.release()
 
 
 def create_frames_from_video(
@@ -89,33 +112,45 @@ def create_frames_from_video(
     configuration: Optional[EncodingConfiguration] = None,
 ) -> Iterator[MatLike]:
     """
-    Captures a video and returns all the frames.
+    Captures a video and returns the frames.
+
+    If the configuration has a frame stride above one, only every n'th frame is decoded and returned.
+    This only suits videos that repeat each frame at least n times, as the other frames are skipped.
 
     Inspiration from:
     https://stackoverflow.com/questions/18954889/how-to-process-images-of-a-video-frame-by-frame-in-video-streaming-using-openc
     """
 
+    frame_stride = configuration.frame_stride if configuration is not None else 1
+    show_window = configuration is not None and configuration.show_decoding_window
+
     capture = cv2.VideoCapture(file_path)
 
-    while capture.isOpened():
-        ret, frame = capture.read()
-        if not ret:
-            break
+    # A capture that failed to open cannot grab, so it is only checked once.
+    if capture.isOpened():
+        for index in count():
+            # Grab every frame, but only retrieve (decode) every n'th frame.
+            if not capture.grab():
+                break
 
-        if configuration is not None:
-            if configuration.show_decoding_window:
-                cv2.imshow(f"Reading '{file_path}'", frame)
+            if index % frame_stride != 0:
+                continue
 
-            if configuration.show_decoding_window and cv2.waitKey(10) & 0xFF == ord(
-                "q"
-            ):
+            ret, frame = capture.retrieve()
+            if not ret:
                 break
 
-        yield frame
+            if show_window:
+                cv2.imshow(f"Reading '{file_path}'", frame)
+
+                if cv2.waitKey(10) & 0xFF == ord("q"):
+                    break
+
+            yield frame
 
     capture.release()
 
-    if configuration is not None and configuration.show_decoding_window:
+    if show_window:
         cv2.destroyAllWindows()
 
 
@@ -126,6 +161,41 @@ def create_frames_from_capture(
 ) -> List[MatLike]:
     """
     Captures the screen and returns the frames.
+    """
+
+    return list(_capture_frames(configuration, duration_seconds, region))
+
+
+def create_video_from_capture(
+    file_path: str,
+    configuration: EncodingConfiguration,
+    duration_seconds: int,
+    region: Optional[tuple[int, int, int, int]] = None,
+) -> None:
+    """
+    Captures the screen and writes the frames to a video as they are captured.
+
+    At most one second of frames is held in memory, so the capture duration is not bound by memory.
+    The camera is created, read and stopped on the writer's background thread. If writing falls
+    behind, the oldest held frames are dropped instead of stalling the capture.
+    """
+
+    _write_video(
+        _capture_frames(configuration, duration_seconds, region),
+        file_path,
+        configuration,
+        max_prefetched=max(configuration.frames_per_second, 1),
+        drop_oldest=True,
+    )
+
+
+def _capture_frames(
+    configuration: EncodingConfiguration,
+    duration_seconds: int,
+    region: Optional[tuple[int, int, int, int]] = None,
+) -> Iterator[MatLike]:
+    """
+    Captures the screen and yields the frames.
 
     Utilizes the high FPS video capture package 'dxcam': https://github.com/ra1nty/DXcam
 
@@ -142,42 +212,44 @@ def create_frames_from_capture(
     prev_time = 0
     fps_display_delay = 0
     fps_delayed = 0
-    fps_list = [0.0] * 10
-
-    frames: List[MatLike] = []
 
-    stop = time.time() + duration_seconds
-    while time.time() < stop:
-        frame = camera.get_latest_frame()
+    # Ring buffer of the last FPS values, with a running sum for the average.
+    fps_ring = [0.0] * FPS_AVERAGE_WINDOW
+    fps_ring_index = 0
+    fps_sum = 0.0
 
-        if configuration.verbose:
-            # Calculate the FPS
-            curr_time = time.perf_counter()
-            fps = 1 / (curr_time - prev_time)
-            prev_time = curr_time
-
-            # Add current FPS to a list and remove last element.
-            fps_list.append(fps)
-            fps_list.pop(0)
+    try:
+        stop = time.time() + duration_seconds
+        while time.time() < stop:
+            frame = camera.get_latest_frame()
 
-            # Get the average FPS using the last 10 frames.
-            avg_fps = sum(fps_list) / len(fps_list)
+            if configuration.verbose:
+                # Calculate the FPS
+                curr_time = time.perf_counter()
+                fps = 1 / (curr_time - prev_time)
+                prev_time = curr_time
 
-            fps_display_delay += 1
+                # Replace the oldest FPS value with the current one.
+                fps_sum += fps - fps_ring[fps_ring_index]
+                fps_ring[fps_ring_index] = fps
+                fps_ring_index = (fps_ring_index + 1) % FPS_AVERAGE_WINDOW
 
-            if fps_display_delay >= 3:
-                fps_delayed = avg_fps
-                fps_display_delay = 0
+                # Get the average FPS using the last frames.
+                avg_fps = fps_sum / FPS_AVERAGE_WINDOW
 
-            print(f"FPS: {fps_delayed: .0f}")
+                fps_display_delay += 1
 
-        frames.append(frame)
+                if fps_display_delay >= 3:
+                    fps_delayed = avg_fps
+                    fps_display_delay = 0
 
-    # Release resources.
-    camera.stop()
-    del camera
+                print(f"FPS: {fps_delayed: .0f}")
 
-    return frames
+            yield frame
+    finally:
+        # Release resources.
+        camera.stop()
+        del camera
 
 
 @dataclass
@@ -189,27 +261,15 @@ class CV2VideoHandler(VideoHandler):
 # region ----- Image and frame helpers -----
 
 
-def _pil_to_cv2(image: Union[BaseImage, Image]) -> MatLike:
+def _bgr_to_grayscale(frame: MatLike) -> MatLike:
     """
-    Helper function that converts a PIL image to CV2 image array.
-
-    PIL-like images are used by 'qrcode' behind the hood.
-
-    We pre-convert the PIL image into RGB for safe conversion to CV2.
-
-    'qrcode' GitHub page:
-    https://github.com/lincolnloop/python-qrcode
+    Helper function that converts a BGR frame to a single channel grayscale frame.
     """
 
-    if isinstance(image, (BaseImage, Image)):
-        rgb_image = image.convert(RGB)
-    else:
-        raise TypeError(f"Unsupported data type: {type(image)}")
-
-    image_array = np.array(rgb_image)
-    cv2_image_array = cv2.cvtColor(image_array, cv2.COLOR_RGB2BGR)
+    if frame.ndim == 2:
+        return frame
 
-    return cv2_image_array
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
 
 def resize_frame(frame: MatLike, size: Tuple[int, int]):
@@ -218,8 +278,9 @@ def resize_frame(frame: MatLike, size: Tuple[int, int]):
 
     width, height = size
 
-    if frame.shape[:2] != size:
-        frame = cv2.resize(frame, (width, height))
+    # The frame shape is (height, width), whereas the size is (width, height).
+    if frame.shape[:2] != (height, width):
+        frame = cv2.resize(frame, size)
 
     return frame
 
@@ -0,0 +1,58 @@
+import threading
+from contextlib import closing
+from unittest import TestCase
+
+from src.base import (
+    EncodingConfiguration,
+    Encoder,
+    IdentitySerializer,
+    VideoEncodingPipeline,
+    VideoHandler,
+    validate_equals,
+)
+from src.performance import execute_prefetched_iter
+
+MOCK_FILE_NAME = "temp.mp4"
+
+
+class TestVideoEncodingPipeline(TestCase):
+    def test__encode__should__close_payload_frames__when__writing_fails(
+        self,
+    ) -> None:
+        # Arrange
+        payload_closed = []
+
+        def encode(data, configuration, is_header):
+            if is_header:
+                return iter([data])
+
+            def generate_payload_frames():
+                try:
+                    yield from range(100)
+                finally:
+                    payload_closed.append(threading.current_thread())
+
+            return generate_payload_frames()
+
+        def write(frames, file_path, configuration):
+            # Writes a few frames on a background thread, then fails.
+            with closing(execute_prefetched_iter(frames)) as prefetched_frames:
+                for index, _ in enumerate(prefetched_frames):
+                    if index == 2:
+                        raise ValueError("Writing failed.")
+
+        pipeline = VideoEncodingPipeline(
+            serializer=IdentitySerializer,
+            encoder=Encoder(encode=encode, decode=None),
+            video_handler=VideoHandler(write=write, read=None),
+            validation_function=validate_equals,
+        )
+
+        # Act
+        with self.assertRaises(ValueError):
+            pipeline.encode(b"data", EncodingConfiguration(), MOCK_FILE_NAME)
+
+        # Assert
+        # The frames are closed by the writer's background thread, not by garbage collection.
+        self.assertEqual(len(payload_closed), 1)
+        self.assertIsNot(payload_closed[0], threading.current_thread())
@@ -0,0 +1,60 @@
+import threading
+from unittest import TestCase
+
+from parameterized import parameterized
+from src.performance import execute_prefetched_iter
+
+
+class TestPerformance(TestCase):
+
+    @parameterized.expand([(0,), (1,), (100,)])
+    def test__execute_prefetched_iter__should__return_items_in_order(
+        self, length
+    ) -> None:
+
+        # Arrange
+        items = range(length)
+
+        # Act
+        result = list(execute_prefetched_iter(items))
+
+        # Assert
+        self.assertEqual(result, list(items))
+
+    def test__execute_prefetched_iter__should__close_source_and_stop_thread__when__closed_early(
+        self,
+    ) -> None:
+
+        # Arrange
+        closed_on_threads = []
+        thread_count = threading.active_count()
+
+        def generate_items():
+            try:
+                yield from range(100)
+            finally:
+                closed_on_threads.append(threading.current_thread())
+
+        prefetched_items = execute_prefetched_iter(generate_items(), max_prefetched=2)
+
+        # Act
+        next(prefetched_items)
+        prefetched_items.close()
+
+        # Assert
+        self.assertEqual(len(closed_on_threads), 1)
+        self.assertIsNot(closed_on_threads[0], threading.current_thread())
+        self.assertEqual(threading.active_count(), thread_count)
+
+    def test__execute_prefetched_iter__should__raise_source_exception(
+        self,
+    ) -> None:
+
+        # Arrange
+        def generate_items():
+            yield 1
+            raise ValueError("Source failed.")
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            list(execute_prefetched_iter(generate_items()))
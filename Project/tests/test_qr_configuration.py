@@ -1,12 +1,15 @@
 import unittest
 
+from parameterized import parameterized
 from src.qr_configuration import QREncodingConfiguration
 
 
 class TestQRConfiguration(unittest.TestCase):
 
-    def setUp(self) -> None:
-        self.original_config = QREncodingConfiguration(
+    @classmethod
+    def setUpClass(cls) -> None:
+        # The configuration is only read by the tests, so it is serialized once.
+        cls.original_config = QREncodingConfiguration(
             enable_multiprocessing=True,
             frames_per_second=30,
             show_decoding_window=True,
@@ -14,6 +17,7 @@ class TestQRConfiguration(unittest.TestCase):
             chunk_size=512,
             max_workers=4,
         )
+        cls.serialized_config = QREncodingConfiguration.to_bytes(cls.original_config)
 
     def test__to_bytes_should__serialize_without_error(self) -> None:
         # Arrange & Act
@@ -25,7 +29,7 @@ class TestQRConfiguration(unittest.TestCase):
 
     def test__from_bytes_should__deserialize_to_configuration_object(self) -> None:
         # Arrange
-        serialized = QREncodingConfiguration.to_bytes(self.original_config)
+        serialized = self.serialized_config
 
         # Act
         deserialized = QREncodingConfiguration.from_bytes(serialized)
@@ -35,7 +39,7 @@ class TestQRConfiguration(unittest.TestCase):
 
     def test__from_bytes_should__return_new_configuration_instance(self) -> None:
         # Arrange
-        serialized = QREncodingConfiguration.to_bytes(self.original_config)
+        serialized = self.serialized_config
 
         # Act
         deserialized = QREncodingConfiguration.from_bytes(serialized)
@@ -53,3 +57,19 @@ class TestQRConfiguration(unittest.TestCase):
         # Act / Assert
         with self.assertRaises(Exception):
             QREncodingConfiguration.from_bytes(invalid_data)
+
+    @parameterized.expand([(0,), (-1,)])
+    def test__init__should__raise_exception_if_frame_stride_is_below_one(
+        self, frame_stride
+    ) -> None:
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            QREncodingConfiguration(frame_stride=frame_stride)
+
+    @parameterized.expand([(0,), (-1,)])
+    def test__init__should__raise_exception_if_max_decode_dimension_is_below_one(
+        self, max_decode_dimension
+    ) -> None:
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            QREncodingConfiguration(max_decode_dimension=max_decode_dimension)
@@ -1,50 +1,170 @@
 import base64
 from unittest import TestCase
+from unittest.mock import patch
 
+import numpy as np
 from parameterized import parameterized
-from src.enums import QREncodingLibrary
+from pyzbar.pyzbar import decode
+from src.enums import QRDecodingLibrary, QREncodingLibrary
 from src.qr_configuration import QREncodingConfiguration
-from src.qr_decoding import _decode_qr_image
+from src.qr_decoding import _decode_qr_image, _downscale_image
 from src.qr_encoding import _generate_qr_image
 
 
 class TestQRDecoding(TestCase):
     @parameterized.expand(
         [
-            (b"Hello World", QREncodingLibrary.QRCODE),
-            (b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80", QREncodingLibrary.QRCODE),
+            (b"Hello World", QREncodingLibrary.QRCODE, QRDecodingLibrary.PYZBAR),
+            (
+                b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80",
+                QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (
+                b"\xc3\xa4\xc2\xbd\xc2\xa0\xc3\xa5\xc2\xa5\xc2\xbd",
+                QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (
+                b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff",
+                QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (b"Hello World", QREncodingLibrary.SEGNO, QRDecodingLibrary.PYZBAR),
+            (
+                b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80",
+                QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (
+                b"\xc3\xa4\xc2\xbd\xc2\xa0\xc3\xa5\xc2\xa5\xc2\xbd",
+                QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (
+                b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff",
+                QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.PYZBAR,
+            ),
+            (b"Hello World", QREncodingLibrary.QRCODE, QRDecodingLibrary.OPEN_CV),
+            (
+                b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80",
+                QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.OPEN_CV,
+            ),
             (
                 b"\xc3\xa4\xc2\xbd\xc2\xa0\xc3\xa5\xc2\xa5\xc2\xbd",
                 QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.OPEN_CV,
             ),
             (
                 b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff",
                 QREncodingLibrary.QRCODE,
+                QRDecodingLibrary.OPEN_CV,
+            ),
+            (b"Hello World", QREncodingLibrary.SEGNO, QRDecodingLibrary.OPEN_CV),
+            (
+                b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80",
+                QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.OPEN_CV,
             ),
-            (b"Hello World", QREncodingLibrary.SEGNO),
-            (b"\xff\xfe\xfd\xfa\x00\x01\xf0\xc1\xc0\x80", QREncodingLibrary.SEGNO),
             (
                 b"\xc3\xa4\xc2\xbd\xc2\xa0\xc3\xa5\xc2\xa5\xc2\xbd",
                 QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.OPEN_CV,
+            ),
+            (
+                b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff",
+                QREncodingLibrary.SEGNO,
+                QRDecodingLibrary.OPEN_CV,
             ),
-            (b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff", QREncodingLibrary.SEGNO),
         ]
     )
     def test__decode_qr_image__should__return_original_data(
         self,
         data: bytes,
         qr_encoding_library: QREncodingLibrary,
+        qr_decoding_library: QRDecodingLibrary,
     ) -> None:
         # Arrange
-        configuration = QREncodingConfiguration(qr_encoding_library=qr_encoding_library)
+        configuration = QREncodingConfiguration(
+            qr_encoding_library=qr_encoding_library,
+            qr_decoding_library=qr_decoding_library,
+        )
 
         data_b64 = base64.b64encode(data)
         qr_code_image = _generate_qr_image(data_b64, configuration)
 
         # Act
-        result_b64 = _decode_qr_image(qr_code_image, configuration)
+        # 'pyzbar' is watched, so the OpenCV rows cannot pass through the fallback.
+        with patch("src.qr_decoding.decode", wraps=decode) as pyzbar_decode:
+            result_b64 = _decode_qr_image(qr_code_image, configuration)
         result = base64.b64decode(result_b64)
 
         # Assert
         self.assertEqual(data, result)
         self.assertEqual(data_b64, result_b64)
+        self.assertEqual(
+            pyzbar_decode.called, qr_decoding_library == QRDecodingLibrary.PYZBAR
+        )
+
+    @parameterized.expand(
+        [
+            (b"\xe4\xbd",),
+            (b"\xc3\xa4\xc2\xbd",),
+            (b"TEST TEST!\xff\xfe\xfa\x00ABC\x00\x00\xff\xff",),
+        ]
+    )
+    def test__decode_qr_image__should__fall_back_to_pyzbar__when__open_cv_data_is_not_ascii(
+        self, data: bytes
+    ) -> None:
+        # Arrange
+        configuration = QREncodingConfiguration(
+            qr_decoding_library=QRDecodingLibrary.OPEN_CV
+        )
+        qr_code_image = _generate_qr_image(data, configuration)
+
+        # Act
+        with patch("src.qr_decoding.decode", wraps=decode) as pyzbar_decode:
+            result = _decode_qr_image(qr_code_image, configuration)
+
+        # Assert
+        self.assertEqual(data, result)
+        self.assertTrue(pyzbar_decode.called)
+
+    @parameterized.expand([(QRDecodingLibrary.PYZBAR,), (QRDecodingLibrary.OPEN_CV,)])
+    def test__decode_qr_image__should__return_empty_bytes__when__image_has_no_qr_code(
+        self, qr_decoding_library: QRDecodingLibrary
+    ) -> None:
+        # Arrange
+        configuration = QREncodingConfiguration(qr_decoding_library=qr_decoding_library)
+        blank_image = np.full((100, 100, 3), 255, dtype=np.uint8)
+
+        # Act
+        result = _decode_qr_image(blank_image, configuration)
+
+        # Assert
+        self.assertEqual(b"", result)
+
+    @parameterized.expand(
+        [
+            ((100, 100, 3), 1200, (100, 100, 3)),
+            ((1285, 1285, 3), 1200, (642, 642, 3)),
+            ((2570, 2570, 3), 1200, (856, 856, 3)),
+            ((1080, 1920, 3), 1000, (540, 960, 3)),
+        ]
+    )
+    def test__downscale_image__should__fit_image_within_max_dimension(
+        self,
+        shape: tuple,
+        max_dimension: int,
+        expected_shape: tuple,
+    ) -> None:
+        # Arrange
+        image = np.full(shape, 255, dtype=np.uint8)
+
+        # Act
+        result = _downscale_image(image, max_dimension)
+
+        # Assert
+        self.assertEqual(expected_shape, result.shape)
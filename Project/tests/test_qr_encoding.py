@@ -1,10 +1,11 @@
 from unittest import TestCase
 
+import numpy as np
 from parameterized import parameterized
-from src.enums import QRErrorCorrectionLevel
+from src.enums import QRErrorCorrectionLevel, VideoCodec
 from src.qr_configuration import QREncodingConfiguration
-from src.qr_encoding import generate_qr_frames
-from src.utils import generate_random_bytes, try_get_iter_count
+from src.qr_encoding import count_qr_frames, generate_qr_frames
+from src.utils import generate_random_bytes
 
 
 class TestQREncoding(TestCase):
@@ -25,20 +26,76 @@ class TestQREncoding(TestCase):
             (QRErrorCorrectionLevel.H, 1, 4, 5),
         ],
     )
-    def test__generate_qr_frames__should__return_correct_number_of_frames__when__data_is_chunked(
+    def test__count_qr_frames__should__return_correct_number_of_frames__when__data_is_chunked(
         self, error_correct_level, remainder, chunk_size, expected_frames_length
     ) -> None:
 
         # Arrange
         max_bytes = QRErrorCorrectionLevel.to_max_bytes(error_correct_level)
 
-        input_data_bytes = generate_random_bytes(chunk_size * max_bytes + remainder)
+        data_length = chunk_size * max_bytes + remainder
         configuration = QREncodingConfiguration(error_correction=error_correct_level)
 
         # Act
-        frames = generate_qr_frames(input_data_bytes, configuration)
-        success, count, _ = try_get_iter_count(frames)
+        count = count_qr_frames(data_length, configuration)
 
         # Assert
-        self.assertTrue(success)
         self.assertEqual(count, expected_frames_length)
+
+    def test__generate_qr_frames__should__return_correct_number_of_frames__when__data_is_chunked(
+        self,
+    ) -> None:
+
+        # Arrange
+        configuration = QREncodingConfiguration(
+            error_correction=QRErrorCorrectionLevel.H
+        )
+        max_bytes = QRErrorCorrectionLevel.to_max_bytes(configuration.error_correction)
+
+        input_data_bytes = generate_random_bytes(2 * max_bytes + 1)
+
+        # Act
+        frames = generate_qr_frames(input_data_bytes, configuration)
+        count = sum(1 for _ in frames)
+
+        # Assert
+        self.assertEqual(count, 3)
+        self.assertEqual(count, count_qr_frames(len(input_data_bytes), configuration))
+
+    @parameterized.expand([(False,), (True,)])
+    def test__generate_qr_frames__should__return_separate_writeable_frames__when__chunks_repeat(
+        self, enable_multiprocessing
+    ) -> None:
+
+        # Arrange
+        configuration = QREncodingConfiguration(
+            enable_multiprocessing=enable_multiprocessing
+        )
+        max_bytes = QRErrorCorrectionLevel.to_max_bytes(configuration.error_correction)
+
+        input_data_bytes = bytes(3 * max_bytes)
+
+        # Act
+        frames = list(generate_qr_frames(input_data_bytes, configuration))
+
+        # Assert
+        self.assertEqual(len(frames), 3)
+        self.assertIsNot(frames[0], frames[1])
+        self.assertTrue(np.array_equal(frames[0], frames[1]))
+        self.assertTrue(all(frame.flags.writeable for frame in frames))
+
+    @parameterized.expand([(VideoCodec.MP4V, 3), (VideoCodec.FFV1, 2)])
+    def test__generate_qr_frames__should__match_video_codec_channels(
+        self, video_codec, expected_dimensions
+    ) -> None:
+
+        # Arrange
+        configuration = QREncodingConfiguration(
+            enable_multiprocessing=False, video_codec=video_codec
+        )
+
+        # Act
+        frames = list(generate_qr_frames(b"Hello World", configuration))
+
+        # Assert
+        self.assertEqual(frames[0].ndim, expected_dimensions)
@@ -1,21 +1,38 @@
+import os
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from parameterized import parameterized
 from src.constants import MatLike
-from src.enums import QREncodingLibrary, QRErrorCorrectionLevel
+from src.enums import QREncodingLibrary, QRErrorCorrectionLevel, VideoCodec
 from src.qr_configuration import QREncodingConfiguration
 from src.qr_pipeline import create_qr_video_encoding_pipeline
-from src.utils import generate_random_bytes, remove_file
+from src.utils import generate_random_bytes
+from src.video_processing import create_video_from_frames
 
 DATA_LENGTH = 2331
 MOCK_FILE_NAME = "temp.mp4"
+MOCK_LOSSLESS_FILE_NAME = "temp.avi"
 
 
 class TestQRPipeline(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # The pipeline holds no state between runs, so it is shared by all tests.
+        cls.pipeline_default = create_qr_video_encoding_pipeline()
+
     def setUp(self) -> None:
-        self.pipeline_default = create_qr_video_encoding_pipeline()
         self.configuration_default = QREncodingConfiguration()
 
+        # Videos are written to a temporary directory that is removed after each test.
+        self.temporary_directory = TemporaryDirectory()
+        self.video_file_path = os.path.join(
+            self.temporary_directory.name, MOCK_FILE_NAME
+        )
+        self.lossless_video_file_path = os.path.join(
+            self.temporary_directory.name, MOCK_LOSSLESS_FILE_NAME
+        )
+
     def test__encode__should__return_frames(self) -> None:
         # Arrange
         input_data = generate_random_bytes(DATA_LENGTH)
@@ -80,7 +97,7 @@ class TestQRPipeline(TestCase):
         )
 
         result = self.pipeline_default.run(
-            input_data, MOCK_FILE_NAME, configuration, mock=False
+            input_data, self.video_file_path, configuration, mock=True
         )
 
         self.assertTrue(result.is_valid)
@@ -88,6 +105,64 @@ class TestQRPipeline(TestCase):
         self.assertIsNone(result.exception)
         self.assertEqual(input_data, result.value)
 
+    def test__run__should__return_original_data__when__written_to_video_file(
+        self,
+    ) -> None:
+        # Arrange
+        input_data = generate_random_bytes(DATA_LENGTH)
+
+        # Act
+        result = self.pipeline_default.run(
+            input_data, self.video_file_path, self.configuration_default, mock=False
+        )
+
+        # Assert
+        self.assertTrue(result.is_valid)
+        self.assertEqual(input_data, result.value)
+
+    @parameterized.expand([(QREncodingLibrary.SEGNO,), (QREncodingLibrary.QRCODE,)])
+    def test__run__should__return_original_data__when__video_codec_is_lossless(
+        self, qr_encoding_library: QREncodingLibrary
+    ) -> None:
+        # Arrange
+        input_data = generate_random_bytes(DATA_LENGTH)
+        configuration = QREncodingConfiguration(
+            qr_encoding_library=qr_encoding_library, video_codec=VideoCodec.FFV1
+        )
+
+        # Act
+        result = self.pipeline_default.run(
+            input_data, self.lossless_video_file_path, configuration, mock=False
+        )
+
+        # Assert
+        self.assertTrue(result.is_valid)
+        self.assertEqual(input_data, result.value)
+
+    def test__decode__should__return_original_data__when__frame_stride_skips_repeated_frames(
+        self,
+    ) -> None:
+        # Arrange
+        input_data = generate_random_bytes(DATA_LENGTH)
+        configuration = QREncodingConfiguration(
+            video_codec=VideoCodec.FFV1, frame_stride=2
+        )
+        frames = self.pipeline_default.encode(input_data, configuration)
+
+        # Each frame is written twice, as in a capture at twice the video frame rate.
+        repeated_frames = (frame for frame in frames for _ in range(2))
+        create_video_from_frames(
+            repeated_frames, self.lossless_video_file_path, configuration
+        )
+
+        # Act
+        output_data = self.pipeline_default.decode(
+            configuration, self.lossless_video_file_path
+        )
+
+        # Assert
+        self.assertEqual(input_data, output_data)
+
     def tearDown(self):
-        # Remove test file after use.
-        remove_file(MOCK_FILE_NAME)
+        # Remove test files after use.
+        self.temporary_directory.cleanup()
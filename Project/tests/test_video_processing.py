@@ -0,0 +1,94 @@
+import os
+import threading
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from src.base import EncodingConfiguration
+from src.video_processing import (
+    create_frames_from_video,
+    create_video_from_capture,
+    create_video_from_frames,
+)
+
+MOCK_FILE_NAME = "temp.mp4"
+MOCK_FRAME_SHAPE = (64, 64, 3)
+
+
+class TestVideoProcessing(TestCase):
+    def setUp(self) -> None:
+        self.configuration_default = EncodingConfiguration(frames_per_second=24)
+
+        # Videos are written to a temporary directory that is removed after each test.
+        self.temporary_directory = TemporaryDirectory()
+        self.video_file_path = os.path.join(
+            self.temporary_directory.name, MOCK_FILE_NAME
+        )
+
+    def test__create_video_from_capture__should__write_frames_and_stop_camera_on_one_thread(
+        self,
+    ) -> None:
+        # Arrange
+        camera_threads = []
+        frames_per_second = self.configuration_default.frames_per_second
+        duration_seconds = 1
+
+        # The capture runs on a fake clock, which the camera advances by one frame per read,
+        # so the number of captured frames does not depend on real time.
+        frames_read = [0]
+
+        def get_time():
+            return frames_read[0] / frames_per_second
+
+        def get_latest_frame():
+            frames_read[0] += 1
+            return np.zeros(MOCK_FRAME_SHAPE, dtype=np.uint8)
+
+        camera = MagicMock()
+        camera.get_latest_frame.side_effect = get_latest_frame
+        camera.stop.side_effect = lambda: camera_threads.append(
+            threading.current_thread()
+        )
+
+        def create_camera(**kwargs):
+            camera_threads.append(threading.current_thread())
+            return camera
+
+        # Act
+        with (
+            patch("src.video_processing.dxcam.create", side_effect=create_camera),
+            patch("src.video_processing.time") as time_mock,
+        ):
+            time_mock.time.side_effect = get_time
+            create_video_from_capture(
+                self.video_file_path,
+                self.configuration_default,
+                duration_seconds=duration_seconds,
+            )
+
+        frames = list(create_frames_from_video(self.video_file_path))
+
+        # Assert
+        camera.stop.assert_called_once()
+        self.assertEqual(len(camera_threads), 2)
+        self.assertIs(camera_threads[0], camera_threads[1])
+        self.assertEqual(len(frames), duration_seconds * frames_per_second)
+        self.assertEqual(frames[0].shape, MOCK_FRAME_SHAPE)
+
+    def test__create_video_from_frames__should__raise_exception__when__video_cannot_be_opened(
+        self,
+    ) -> None:
+        # Arrange
+        frames = iter([np.zeros(MOCK_FRAME_SHAPE, dtype=np.uint8)])
+        file_path = os.path.join(
+            self.temporary_directory.name, "missing", MOCK_FILE_NAME
+        )
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            create_video_from_frames(frames, file_path, self.configuration_default)
+
+    def tearDown(self):
+        # Remove test files after use.
+        self.temporary_directory.cleanup()